@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Measure sunsite CLI startup time against a budget.
+
+Usage: python benchmarks/startup.py [--runs N] [--budget MS]
+
+Reports the import time of sunsite.cli from `python -X importtime` and the
+wall-clock time of `sunsite init` and `sunsite new`, and exits non-zero if
+a command goes over budget or if importing the CLI pulls in a heavy
+dependency.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules only a build needs; importing the CLI must not load them
+HEAVY_MODULES = ["yaml", "markdown", "frontmatter", "jinja2", "PIL"]
+
+
+def run_python(args, cwd=None):
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    return subprocess.run(
+        [sys.executable] + args,
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_time_ms():
+    """Cumulative import time of sunsite.cli reported by -X importtime"""
+    result = run_python(["-X", "importtime", "-c", "import sunsite.cli"])
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == "sunsite.cli":
+            return int(parts[1]) / 1000
+    return None
+
+
+def heavy_imports():
+    """Heavy modules loaded as a side effect of importing sunsite.cli"""
+    code = (
+        "import sys, sunsite.cli; "
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    return run_python(["-c", code]).stdout.split()
+
+
+def best_time_ms(args, runs):
+    """Best wall-clock time of a Python invocation over several runs"""
+    best = None
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            run_python(args, cwd=tmp)
+            elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure sunsite CLI startup time")
+    parser.add_argument("--runs", "-n", type=int, default=10, help="Runs per command")
+    parser.add_argument("--budget", "-b", type=float, default=50, help="Budget per command in ms")
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first run isn't measured compiling
+    run_python(["-c", "import sunsite.cli"])
+
+    failed = False
+
+    interpreter = best_time_ms(["-c", "pass"], args.runs)
+    print(f"python startup:     {interpreter:7.1f} ms")
+
+    imported = import_time_ms()
+    if imported is not None:
+        print(f"import sunsite.cli: {imported:7.1f} ms")
+
+    heavy = heavy_imports()
+    if heavy:
+        print(f"sunsite.cli imports heavy modules: {', '.join(heavy)}")
+        failed = True
+
+    for name, command in [("init", ["init", "site"]), ("new", ["new", "content/page.md"]), ("--help", ["--help"])]:
+        elapsed = best_time_ms(["-m", "sunsite.cli"] + command, args.runs)
+        status = "ok" if elapsed <= args.budget else "OVER BUDGET"
+        print(f"sunsite {name + ':':<11}{elapsed:7.1f} ms  (budget {args.budget:.0f} ms) {status}")
+        if elapsed > args.budget:
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,9 @@ setup(
         "pyyaml",
         "jinja2",
     ],
+    extras_require={
+        "images": ["Pillow"],
+    },
     entry_points={
         "console_scripts": [
             "sunsite=sunsite.cli:main",
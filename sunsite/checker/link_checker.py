@@ -0,0 +1,284 @@
+import os
+import posixpath
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+from pathlib import Path
+from urllib.parse import unquote
+
+from ..utils.urls import file_url, resolve_url
+
+# Number of files handed to a worker process at once
+CHUNK_SIZE = 256
+
+# Read HTML in blocks so large pages are never held in memory twice
+READ_BLOCK_SIZE = 64 * 1024
+
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(['"]?)([^'")]+?)\1\s*\)|@import\s+(['"])([^'"]+)\3""")
+
+
+TAG_START_PATTERN = re.compile(r'<(!--|[a-zA-Z][^\s/>]*)')
+# Quotes only delimit a value right after "=", as in HTML, so a stray
+# quote such as class=don't can't swallow the rest of the page
+START_TAG_PATTERN = re.compile(r"""<[a-zA-Z][^\s/>]*((?:=\s*"[^"]*"|=\s*'[^']*'|=(?!\s*["'])|[^>=])*)>""")
+# Fallback at the end of a file for a value whose quote never closes
+UNTERMINATED_TAG_PATTERN = re.compile(r'<[a-zA-Z][^\s/>]*([^>]*)>')
+ATTR_PATTERN = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+
+# Elements whose content is raw text and may contain a literal "<"
+RAW_TEXT_END_PATTERNS = {
+    'script': re.compile(r'</script', re.IGNORECASE),
+    'style': re.compile(r'</style', re.IGNORECASE),
+}
+
+
+class _LinkExtractor:
+    """Streaming tokenizer that collects href, src and srcset values,
+    and the ids fragments can point at.
+
+    Only start tags are tokenized; text, end tags, comments and the
+    bodies of script and style elements are skipped.
+    """
+
+    def __init__(self):
+        self.links = []
+        self.ids = set()
+        self._buffer = ""
+
+    def feed(self, data):
+        buf = self._buffer + data
+        self._buffer = buf[self._tokenize(buf, final=False):]
+
+    def close(self):
+        self._tokenize(self._buffer, final=True)
+        self._buffer = ""
+
+    def _tokenize(self, buf, final):
+        """Handle every complete tag in buf and return where the rest starts"""
+        pos = 0
+        while True:
+            match = TAG_START_PATTERN.search(buf, pos)
+            if match is None:
+                # Keep enough to recognise a tag split across blocks
+                return max(pos, len(buf) - 3)
+
+            if match.group(1) == '!--':
+                end = buf.find('-->', match.end())
+                if end < 0:
+                    return len(buf) if final else match.start()
+                pos = end + 3
+                continue
+
+            # Wait for more data while the tag can't have ended yet
+            if buf.find('>', match.end()) < 0:
+                return len(buf) if final else match.start()
+
+            tag = START_TAG_PATTERN.match(buf, match.start())
+            if tag is None:
+                # A quoted value is still open; it may close in the next block
+                if not final:
+                    return match.start()
+                tag = UNTERMINATED_TAG_PATTERN.match(buf, match.start())
+            end = tag.end()
+
+            raw_text_end = RAW_TEXT_END_PATTERNS.get(match.group(1).lower())
+            if raw_text_end is not None:
+                close = raw_text_end.search(buf, end)
+                if close is None:
+                    if not final:
+                        return match.start()
+                    close_pos = len(buf)
+                else:
+                    close_pos = close.start()
+            else:
+                close_pos = end
+
+            self._handle_attrs(match.group(1), tag.group(1))
+            pos = close_pos
+
+    def _handle_attrs(self, tag, attrs):
+        for attr in ATTR_PATTERN.finditer(attrs):
+            name = attr.group(1).lower()
+            if name not in ('href', 'src', 'srcset', 'id', 'name'):
+                continue
+            value = attr.group(2) or attr.group(3) or attr.group(4)
+            if not value:
+                continue
+            if '&' in value:
+                value = unescape(value)
+            if name == 'id':
+                self.ids.add(value)
+            elif name == 'name':
+                # Only <a name> is an anchor; elsewhere it names form fields
+                if tag.lower() == 'a':
+                    self.ids.add(value)
+            elif name == 'srcset':
+                for candidate in value.split(','):
+                    parts = candidate.split()
+                    if parts:
+                        self.links.append(parts[0])
+            else:
+                self.links.append(value)
+
+
+def _extract_html(file_path):
+    extractor = _LinkExtractor()
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            block = f.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            extractor.feed(block)
+    extractor.close()
+    return extractor.links, extractor.ids
+
+
+def _extract_css(file_path):
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        css = f.read()
+    return [match.group(2) or match.group(4) for match in CSS_URL_PATTERN.finditer(css)], None
+
+
+def _scan_files(output_dir, rel_paths):
+    """Extract and resolve internal links, and collect ids, from a chunk of output files"""
+    results = []
+    # Navigation and asset links repeat on nearly every page, so resolve
+    # each distinct link once per directory
+    cache = {}
+    for rel_path in rel_paths:
+        file_path = os.path.join(output_dir, rel_path)
+        if rel_path.endswith('.css'):
+            links, ids = _extract_css(file_path)
+        else:
+            links, ids = _extract_html(file_path)
+
+        base_url = "/" + rel_path
+        base_dir = posixpath.dirname(base_url)
+        resolved = []
+        for link in links:
+            if link.startswith("/") and not link.startswith("//"):
+                key = link
+            elif link.startswith(("#", "?")):
+                key = (base_url, link)
+            else:
+                key = (base_dir, link)
+            target = cache.get(key, False)
+            if target is False:
+                target = cache[key] = resolve_url(base_url, link)
+            if target is not None:
+                resolved.append((link, target[0], target[1]))
+        results.append((rel_path, resolved, ids))
+    return results
+
+
+class LinkChecker:
+    def __init__(self, output_dir="_site", jobs=None):
+        self.output_dir = Path(output_dir)
+        self.jobs = jobs or os.cpu_count() or 1
+
+    def _index_files(self):
+        """Collect every file in the output tree as a set of URL paths"""
+        index = set()
+        sources = []
+        for root, dirs, files in os.walk(self.output_dir):
+            rel_root = os.path.relpath(root, self.output_dir)
+            for name in files:
+                rel_path = name if rel_root == "." else f"{rel_root}/{name}".replace(os.sep, "/")
+                index.add("/" + rel_path)
+                if name.endswith(('.html', '.htm', '.css')):
+                    sources.append(rel_path)
+        return index, sorted(sources)
+
+    def _scan(self, sources):
+        chunks = [sources[i:i + CHUNK_SIZE] for i in range(0, len(sources), CHUNK_SIZE)]
+        output_dir = str(self.output_dir)
+
+        # Spawning workers costs more than scanning a small site inline
+        if self.jobs == 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                yield from _scan_files(output_dir, chunk)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            for results in executor.map(_scan_files, [output_dir] * len(chunks), chunks):
+                yield from results
+
+    @staticmethod
+    def _lookup(index, path):
+        """Find the output file a URL path is served from"""
+        if path in index:
+            return path
+        candidate = path + "index.html" if path.endswith("/") else path + "/index.html"
+        return candidate if candidate in index else None
+
+    @staticmethod
+    def _has_anchor(ids, fragment):
+        """Check whether a fragment names an element of a page"""
+        # An empty fragment and #top scroll to the top of any page
+        if not fragment or fragment.lower() == 'top':
+            return True
+        return fragment in ids or unquote(fragment) in ids
+
+    def check(self):
+        """Check all internal links in the output directory.
+
+        Links with a fragment must also name an id (or <a name>) on the
+        HTML page they point to.
+        """
+        if not self.output_dir.exists():
+            print(f"Directory {self.output_dir} does not exist.")
+            return None
+
+        index, sources = self._index_files()
+        pages = [path for path in index if path.endswith(('.html', '.htm'))]
+        inbound = dict.fromkeys(pages, 0)
+        broken = []
+        link_count = 0
+        # Page -> ids, and links with fragments, checked once every page is scanned
+        anchors = {}
+        fragments = []
+
+        for rel_path, links, ids in self._scan(sources):
+            source = "/" + rel_path
+            source_url = file_url(rel_path)
+            if ids is not None:
+                anchors[source] = ids
+            for link, path, fragment in links:
+                link_count += 1
+                target = self._lookup(index, path)
+                if target is None:
+                    broken.append((source_url, link))
+                    continue
+                if fragment:
+                    fragments.append((source_url, link, target, fragment))
+                if target != source and target in inbound:
+                    inbound[target] += 1
+
+        for source_url, link, target, fragment in fragments:
+            ids = anchors.get(target)
+            if ids is not None and not self._has_anchor(ids, fragment):
+                broken.append((source_url, link))
+
+        orphans = sorted(
+            file_url(path[1:]) for path, count in inbound.items()
+            if count == 0 and path != "/index.html"
+        )
+
+        return {
+            'pages': len(pages),
+            'links': link_count,
+            'broken': sorted(broken),
+            'orphans': orphans,
+        }
+
+    def report(self, result):
+        """Print a link check result"""
+        for source, link in result['broken']:
+            print(f"Broken link in {source}: {link}")
+        for url in result['orphans']:
+            print(f"Orphan page: {url}")
+
+        print(
+            f"Checked {result['pages']} pages and {result['links']} links: "
+            f"{len(result['broken'])} broken, {len(result['orphans'])} orphans"
+        )
@@ -27,6 +27,11 @@ theme:
   font: "Inter"
   roundness: "medium"  # none, small, medium, large
   shadows: true
+# Responsive image variants (requires Pillow)
+# images:
+#   widths: [480, 960, 1600]
+#   formats: [webp]
+#   quality: 80
 """
     with open(project_dir / "sunsite.yaml", "w") as f:
         f.write(config)
@@ -53,11 +58,56 @@ This is an example page created with sunsite.
 
 def build_site(args):
     """Build the static site from markdown files"""
-    from sunsite import build_site as build
-    output = build(project_dir=".", output_dir=args.output)
+    if getattr(args, "daemon", False):
+        from sunsite.utils.daemon import request_build
+        response = request_build(output_dir=args.output, check_links=args.check)
+        if response is not None:
+            print(response.get('log', ''), end="")
+            if response.get('broken'):
+                print(f"Site built at {response['output']} with broken links")
+                sys.exit(1)
+            if response['status'] != 'ok':
+                sys.exit(1)
+            print(f"Site built successfully at {response['output']}")
+            return
+        print("No build daemon is available, building in-process. Start one with: sunsite daemon")
+    
+    from sunsite.generator.site_builder import SiteBuilder
+    builder = SiteBuilder(".")
+    output = builder.build(args.output, check_links=args.check)
+    if builder.link_check and builder.link_check['broken']:
+        print(f"Site built at {output} with broken links")
+        sys.exit(1)
     print(f"Site built successfully at {output}")
 
 
+def check_site(args):
+    """Check the built site for broken links and orphan pages"""
+    from sunsite.checker.link_checker import LinkChecker
+    checker = LinkChecker(args.output, jobs=args.jobs)
+    result = checker.check()
+    if result is None:
+        sys.exit(1)
+    
+    checker.report(result)
+    if result['broken']:
+        sys.exit(1)
+
+
+def run_daemon(args):
+    """Run a build daemon that keeps the site warm between builds"""
+    from sunsite.utils.daemon import run_daemon as run, stop_daemon
+    
+    if args.stop:
+        if stop_daemon():
+            print("Daemon stopped.")
+        else:
+            print("No build daemon is running.")
+        return
+    
+    run(output_dir=args.output)
+
+
 def serve_site(args):
     """Serve the site locally for development"""
     from sunsite.utils.server import serve
@@ -66,6 +116,8 @@ def serve_site(args):
     class BuildArgs:
         def __init__(self, output_dir="_site"):
             self.output = output_dir
+            self.check = False
+            self.daemon = False
     
     # Вызываем build_site с правильными аргументами
     build_site(BuildArgs())
@@ -109,6 +161,18 @@ def main():
     # build command
     build_parser = subparsers.add_parser("build", help="Build the static site")
     build_parser.add_argument("--output", "-o", default="_site", help="Output directory")
+    build_parser.add_argument("--check", action="store_true", help="Check for broken links after building")
+    build_parser.add_argument("--daemon", "-d", action="store_true", help="Build with the running build daemon")
+    
+    # daemon command
+    daemon_parser = subparsers.add_parser("daemon", help="Run a build daemon for fast repeated builds")
+    daemon_parser.add_argument("--output", "-o", default="_site", help="Output directory for the initial build")
+    daemon_parser.add_argument("--stop", action="store_true", help="Stop the running build daemon")
+    
+    # check command
+    check_parser = subparsers.add_parser("check", help="Check the built site for broken links")
+    check_parser.add_argument("--output", "-o", default="_site", help="Output directory to check")
+    check_parser.add_argument("--jobs", "-j", type=int, help="Number of worker processes")
     
     # serve command
     serve_parser = subparsers.add_parser("serve", help="Serve the site locally")
@@ -126,6 +190,10 @@ def main():
         init_project(args)
     elif args.command == "build":
         build_site(args)
+    elif args.command == "daemon":
+        run_daemon(args)
+    elif args.command == "check":
+        check_site(args)
     elif args.command == "serve":
         serve_site(args)
     elif args.command == "new":
@@ -0,0 +1,235 @@
+import heapq
+import re
+from bisect import bisect_left
+from datetime import date, datetime
+from itertools import islice
+
+# Sort key date for pages without a date, so they list after dated pages
+UNDATED = datetime.min
+
+SLUG_PATTERN = re.compile(r'[^\w]+')
+
+# Newest pages of each tag considered by related(), so a page in a large
+# tag doesn't have to be scored against every other page in it
+RELATED_CANDIDATES = 50
+
+
+def tag_slug(tag):
+    """Turn a tag name into a URL-safe slug"""
+    slug = SLUG_PATTERN.sub('-', str(tag).lower()).strip('-')
+    return slug or 'tag'
+
+
+def tag_url(slug):
+    """Get the URL of a tag's listing page"""
+    return f"/tags/{slug}/"
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.strip()).replace(tzinfo=None)
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_tags(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+
+    tags = {}
+    for name in value:
+        name = str(name).strip()
+        if name:
+            tags.setdefault(tag_slug(name), name)
+    return [{'name': name, 'slug': slug, 'url': tag_url(slug)} for slug, name in tags.items()]
+
+
+def _discard(keys, key):
+    i = bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+
+
+class ContentIndex:
+    """Metadata for all pages with views sorted by date and grouped by tag and section.
+
+    Every view is a list of (date, url) keys kept sorted, so queries
+    cost O(result) rather than a scan of all pages. Adding a page only
+    appends its keys; views it touched are re-sorted on the next query,
+    which keeps a full build at one sort per view.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._all = []
+        self._tags = {}
+        self._tag_slugs = []
+        self._sections = {}
+        self._section_names = []
+        self._related = {}
+        self._unsorted = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        return url in self._entries
+
+    @staticmethod
+    def _sort_key(entry):
+        return (entry['date'] or UNDATED, entry['url'])
+
+    def add(self, url, page_data):
+        """Add a page to the index, replacing any existing entry for its URL"""
+        if url in self._entries:
+            self.remove(url)
+
+        metadata = page_data['metadata']
+        section = metadata.get('section')
+        if section is None:
+            # The first directory of the URL, so /blog/ and /blog/post.html share a section
+            parts = url.lstrip("/").split("/")
+            section = parts[0] if len(parts) > 1 else ""
+
+        entry = {
+            'url': url,
+            'title': metadata.get('title', ''),
+            'description': metadata.get('description', ''),
+            'date': _parse_date(metadata.get('date')),
+            'tags': _parse_tags(metadata.get('tags')),
+            'section': str(section),
+            'headings': page_data.get('headings', []),
+            'metadata': metadata,
+        }
+        self._entries[url] = entry
+
+        key = self._sort_key(entry)
+        self._append(self._all, key)
+
+        for tag in entry['tags']:
+            group = self._tags.get(tag['slug'])
+            if group is None:
+                group = self._tags[tag['slug']] = {'name': tag['name'], 'keys': []}
+                self._append(self._tag_slugs, tag['slug'])
+            self._append(group['keys'], key)
+
+        keys = self._sections.get(entry['section'])
+        if keys is None:
+            keys = self._sections[entry['section']] = []
+            self._append(self._section_names, entry['section'])
+        self._append(keys, key)
+
+        self._related.clear()
+        return entry
+
+    def remove(self, url):
+        """Remove a page from the index"""
+        entry = self._entries.pop(url, None)
+        if entry is None:
+            return
+
+        self._sort()
+
+        key = self._sort_key(entry)
+        _discard(self._all, key)
+
+        for tag in entry['tags']:
+            group = self._tags[tag['slug']]
+            _discard(group['keys'], key)
+            if not group['keys']:
+                del self._tags[tag['slug']]
+                _discard(self._tag_slugs, tag['slug'])
+
+        keys = self._sections[entry['section']]
+        _discard(keys, key)
+        if not keys:
+            del self._sections[entry['section']]
+            _discard(self._section_names, entry['section'])
+
+        self._related.clear()
+
+    def _append(self, keys, key):
+        if keys and key < keys[-1]:
+            self._unsorted[id(keys)] = keys
+        keys.append(key)
+
+    def _sort(self):
+        """Sort the views pages were added to since the last query"""
+        if self._unsorted:
+            for keys in self._unsorted.values():
+                keys.sort()
+            self._unsorted.clear()
+
+    def _take(self, keys, limit=None):
+        """Get entries for sorted keys, newest first"""
+        self._sort()
+        return [self._entries[url] for _, url in islice(reversed(keys), limit)]
+
+    def page(self, url):
+        """Get the entry for a page URL"""
+        return self._entries.get(url)
+
+    def pages(self, limit=None):
+        """Get all pages, newest first"""
+        return self._take(self._all, limit)
+
+    def tagged(self, tag, limit=None):
+        """Get pages with a tag (by name or slug), newest first"""
+        group = self._tags.get(tag_slug(tag))
+        return self._take(group['keys'], limit) if group else []
+
+    def in_section(self, section, limit=None):
+        """Get pages in a section, newest first"""
+        return self._take(self._sections.get(section, []), limit)
+
+    def tag(self, tag):
+        """Get a tag's name, slug, URL and page count"""
+        slug = tag_slug(tag)
+        group = self._tags.get(slug)
+        if group is None:
+            return None
+        return {'name': group['name'], 'slug': slug, 'url': tag_url(slug), 'count': len(group['keys'])}
+
+    def tags(self):
+        """Get all tags sorted by slug"""
+        self._sort()
+        return [self.tag(slug) for slug in self._tag_slugs]
+
+    def sections(self):
+        """Get all section names sorted by name"""
+        self._sort()
+        return list(self._section_names)
+
+    def related(self, url, limit=5):
+        """Get pages sharing the most tags with a page, newest first on ties.
+
+        Candidates are the newest RELATED_CANDIDATES pages of each of the
+        page's tags, so a call costs O(tags * RELATED_CANDIDATES) however
+        large the tags grow. Results are memoized until the index changes.
+        """
+        cache_key = (url, limit)
+        if cache_key in self._related:
+            return self._related[cache_key]
+
+        self._sort()
+        entry = self._entries.get(url)
+        scores = {}
+        for tag in entry['tags'] if entry else []:
+            for _, other in islice(reversed(self._tags[tag['slug']]['keys']), RELATED_CANDIDATES):
+                if other != url:
+                    scores[other] = scores.get(other, 0) + 1
+
+        ranked = heapq.nlargest(
+            limit, scores,
+            key=lambda other: (scores[other], self._sort_key(self._entries[other])),
+        )
+        result = self._related[cache_key] = [self._entries[other] for other in ranked]
+        return result
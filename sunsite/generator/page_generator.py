@@ -9,8 +9,18 @@ class PageGenerator:
         self.templates_dir = templates_dir
         self.env = Environment(loader=FileSystemLoader(templates_dir))
         
+        # Hash of the last HTML written to each output path, so repeated
+        # builds can skip rewriting unchanged pages
+        self.written = {}
+        
         # Create default templates if they don't exist
         self._create_default_templates()
+        
+        # Prepare theme data
+        self.theme_data = {
+            'css_variables': self.theme_manager.get_css_variables(),
+            'google_fonts_url': self.theme_manager.get_google_fonts_url(),
+        }
     
     def _create_default_templates(self):
         """Create default templates if they don't exist"""
@@ -121,6 +131,24 @@ class PageGenerator:
       font-size: 1.5em;
     }
     
+    .toc {
+      display: block;
+      margin-bottom: 2rem;
+      padding: 1rem;
+      background-color: var(--accent-color-very-light);
+      border-radius: var(--border-radius);
+    }
+    
+    .toc ul {
+      margin: 0;
+      padding-left: 1.2rem;
+    }
+    
+    .toc a {
+      color: var(--accent-color-dark);
+      padding: 0;
+    }
+    
     footer {
       background-color: #f5f5f5;
       padding: 1rem 0;
@@ -224,40 +252,173 @@ class PageGenerator:
             </h1>
         </header>
         
+        {% if page.headings and (page.headings | length > 1 or page.headings[0].children) %}
+        <nav class="toc">
+            <ul>
+                {% for heading in page.headings recursive %}
+                <li>
+                    <a href="#{{ heading.id }}">{{ heading.text | e }}</a>
+                    {% if heading.children %}<ul>{{ loop(heading.children) }}</ul>{% endif %}
+                </li>
+                {% endfor %}
+            </ul>
+        </nav>
+        {% endif %}
+        
         <div class="content">
             {{ page.content | safe }}
         </div>
+        
+        {% set entry = site.index.page(page.url) if site.index and page.url else none %}
+        {% if entry and entry.tags %}
+        <footer class="page-tags">
+            {% for tag in entry.tags %}<a href="{{ tag.url }}">#{{ tag.name }}</a> {% endfor %}
+            <a href="/tags/">All tags</a>
+        </footer>
+        {% endif %}
     </article>
+    
+    {% if entry %}
+    {% set related = site.index.related(page.url) %}
+    {% if related %}
+    <aside class="related">
+        <h2>Related</h2>
+        <ul>
+            {% for item in related %}
+            <li><a href="{{ item.url }}">{{ item.title }}</a></li>
+            {% endfor %}
+        </ul>
+    </aside>
+    {% endif %}
+    {% endif %}
 {% endblock %}
 """
             with open(page_template_path, "w") as f:
                 f.write(page_template)
+        
+        # Create list template for date-sorted section listings
+        list_template_path = Path(self.templates_dir) / "list.html"
+        if not list_template_path.exists():
+            list_template = """{% extends "base.html" %}
+
+{% block content %}
+    <article>
+        <header class="page-header">
+            <h1>{{ page.metadata.title }}</h1>
+        </header>
+        
+        <div class="content">
+            {{ page.content | safe }}
+        </div>
+        
+        <ul class="listing">
+            {% for item in site.index.in_section(page.metadata.list or site.index.page(page.url).section, page.metadata.limit or none) %}
+            {% if item.url != page.url %}
+            <li>
+                {% if item.date %}<time datetime="{{ item.date.isoformat() }}">{{ item.date.strftime("%Y-%m-%d") }}</time>{% endif %}
+                <a href="{{ item.url }}">{{ item.title }}</a>
+                {% if item.description %}<p>{{ item.description }}</p>{% endif %}
+            </li>
+            {% endif %}
+            {% endfor %}
+        </ul>
+    </article>
+{% endblock %}
+"""
+            with open(list_template_path, "w") as f:
+                f.write(list_template)
+        
+        # Create tag template for the pages with a single tag
+        tag_template_path = Path(self.templates_dir) / "tag.html"
+        if not tag_template_path.exists():
+            tag_template = """{% extends "base.html" %}
+
+{% block content %}
+    <article>
+        <header class="page-header">
+            <h1>#{{ tag.name }}</h1>
+            <p><a href="/tags/">All tags</a></p>
+        </header>
+        
+        <ul class="listing">
+            {% for item in pages %}
+            <li>
+                {% if item.date %}<time datetime="{{ item.date.isoformat() }}">{{ item.date.strftime("%Y-%m-%d") }}</time>{% endif %}
+                <a href="{{ item.url }}">{{ item.title }}</a>
+            </li>
+            {% endfor %}
+        </ul>
+    </article>
+{% endblock %}
+"""
+            with open(tag_template_path, "w") as f:
+                f.write(tag_template)
+        
+        # Create tags template for the list of all tags
+        tags_template_path = Path(self.templates_dir) / "tags.html"
+        if not tags_template_path.exists():
+            tags_template = """{% extends "base.html" %}
+
+{% block content %}
+    <article>
+        <header class="page-header">
+            <h1>Tags</h1>
+        </header>
+        
+        <ul class="listing">
+            {% for tag in tags %}
+            <li><a href="{{ tag.url }}">#{{ tag.name }}</a> ({{ tag.count }})</li>
+            {% endfor %}
+        </ul>
+    </article>
+{% endblock %}
+"""
+            with open(tags_template_path, "w") as f:
+                f.write(tags_template)
     
     def generate_page(self, page_data, output_path, site_data=None):
         """Generate an HTML page from parsed markdown data"""
+        template_name = page_data['metadata'].get('template', 'page.html')
+        return self.render(template_name, output_path, site_data, page=page_data)
+    
+    def generate_listing(self, template_name, output_path, site_data=None, title="", url=None, **context):
+        """Generate an HTML page that isn't backed by a markdown file, such as a tag page"""
+        page_data = {
+            'metadata': {'title': title},
+            'content': '',
+            'url': url,
+        }
+        return self.render(template_name, output_path, site_data, page=page_data, **context)
+    
+    def render(self, template_name, output_path, site_data=None, **context):
+        """Render a template with site and theme data to an output file.
+        
+        Returns None without writing if the file already holds the same HTML.
+        """
         site_data = site_data or {
             'title': 'Sunsite',
             'description': 'A site built with sunsite',
             'navigation': [],
         }
         
-        # Prepare theme data
-        theme_data = {
-            'css_variables': self.theme_manager.get_css_variables(),
-            'google_fonts_url': self.theme_manager.get_google_fonts_url(),
-        }
-        
-        # Render the page template
-        template = self.env.get_template("page.html")
+        # Render the template
+        template = self.env.get_template(template_name)
         html = template.render(
-            page=page_data,
             site=site_data,
-            theme=theme_data
+            theme=self.theme_data,
+            **context
         )
         
+        # Skip unchanged output
+        key = os.path.abspath(output_path)
+        html_hash = hash(html)
+        if self.written.get(key) == html_hash and os.path.exists(output_path):
+            return None
+        
         # Write to output file
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(html)
         
-        return output_path
\ No newline at end of file
+        self.written[key] = html_hash
+        return output_path
@@ -0,0 +1,258 @@
+import os
+import shutil
+from pathlib import Path
+
+import yaml
+
+from ..parser.markdown_parser import MarkdownParser
+from ..themes.theme_manager import ThemeManager
+from .page_generator import PageGenerator
+from ..content.content_index import ContentIndex
+from ..utils.urls import page_url, output_path as page_output_path
+
+
+def _scan_tree(directory):
+    """Map each file under a directory to its (mtime, size).
+
+    Symlinked directories are followed, as shutil.copytree does, and each
+    real directory is visited once so symlink loops terminate.
+    """
+    files = {}
+    stack = [str(directory)]
+    root_length = len(str(directory)) + 1
+    visited = set()
+    while stack:
+        path = stack.pop()
+        try:
+            stat = os.stat(path)
+            if (stat.st_dev, stat.st_ino) in visited:
+                continue
+            visited.add((stat.st_dev, stat.st_ino))
+            entries = os.scandir(path)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[entry.path[root_length:]] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class SiteBuilder:
+    """Builds a site, keeping config, templates, parsed pages and the
+    content index in memory so repeated builds only redo what changed.
+    """
+
+    def __init__(self, project_dir="."):
+        self.project_dir = Path(project_dir)
+        self.content_dir = self.project_dir / "content"
+        self.templates_dir = self.project_dir / "templates"
+        self.static_dir = self.project_dir / "static"
+        self.config_file = self.project_dir / "sunsite.yaml"
+
+        self.config = None
+        self.theme_manager = None
+        self.generator = None
+        self.parser = MarkdownParser()
+        self.content_index = ContentIndex()
+
+        # Result of the link check run by the last build, if any
+        self.link_check = None
+
+        self._config_mtime = None
+        # Content file -> (stat, rel_path, url, page_data)
+        self._pages = {}
+        # State of the last build, to detect unchanged sites and stale files.
+        # Outputs are relative to the output directory.
+        self._signature = None
+        self._static = {}
+        self._outputs = set()
+        self._output_dir = None
+
+    def _load_config(self):
+        """Load sunsite.yaml once, and again only when it changes"""
+        if not self.config_file.exists():
+            print(f"Config file not found at {self.config_file}")
+            return False
+
+        mtime = self.config_file.stat().st_mtime_ns
+        if mtime != self._config_mtime:
+            with open(self.config_file, "r") as f:
+                self.config = yaml.safe_load(f) or {}
+
+            self.theme_manager = ThemeManager(self.config_file, config=self.config)
+            self.generator = PageGenerator(self.theme_manager, templates_dir=str(self.templates_dir))
+            self._config_mtime = mtime
+        return True
+
+    def _parse_pages(self, content):
+        """Parse new and changed markdown files and keep the content index in step"""
+        pages = []
+        for rel in sorted(content):
+            if not rel.endswith(".md"):
+                continue
+
+            cached = self._pages.get(rel)
+            if cached is None or cached[0] != content[rel]:
+                rel_path = Path(rel)
+                url_path = page_url(rel_path)
+                page_data = self.parser.parse_file(self.content_dir / rel_path)
+                page_data['url'] = url_path
+                self.content_index.add(url_path, page_data)
+                cached = self._pages[rel] = (content[rel], rel_path, url_path, page_data)
+            pages.append(cached[1:])
+
+        for rel in [rel for rel in self._pages if rel not in content]:
+            self.content_index.remove(self._pages.pop(rel)[2])
+
+        return pages
+
+    def _copy_static(self, static, output_dir, incremental, outputs):
+        for rel, stat in static.items():
+            target = output_dir / rel
+            outputs.add(Path(rel))
+            if incremental and self._static.get(rel) == stat and target.exists():
+                continue
+            os.makedirs(target.parent, exist_ok=True)
+            shutil.copy2(self.static_dir / rel, target)
+        self._static = static
+
+    def build(self, output_dir="_site", check_links=False):
+        """Build the site into output_dir.
+
+        With check_links, the check result is kept in self.link_check.
+        """
+        output_dir = Path(output_dir)
+        self.link_check = None
+
+        if not self._load_config():
+            return
+
+        content = _scan_tree(self.content_dir)
+        static = _scan_tree(self.static_dir)
+        templates = _scan_tree(self.templates_dir)
+        signature = (self._config_mtime, content, static, templates)
+
+        incremental = output_dir.resolve() == self._output_dir and output_dir.exists()
+        if incremental and signature == self._signature:
+            print("Site is up to date")
+        else:
+            self._build(output_dir, content, static, incremental)
+            self._signature = signature
+            self._output_dir = output_dir.resolve()
+
+        # Check internal links in the generated site
+        if check_links:
+            from ..checker.link_checker import LinkChecker
+            checker = LinkChecker(output_dir)
+            self.link_check = checker.check()
+            checker.report(self.link_check)
+
+        return output_dir
+
+    def _build(self, output_dir, content, static, incremental):
+        config = self.config
+        generator = self.generator
+        content_index = self.content_index
+
+        # Clean output directory, unless updating the previous build in place
+        if not incremental:
+            if output_dir.exists():
+                shutil.rmtree(output_dir)
+            generator.written.clear()
+            self._outputs = set()
+        os.makedirs(output_dir, exist_ok=True)
+        outputs = set()
+
+        # Copy static files
+        self._copy_static(static, output_dir, incremental, outputs)
+
+        # Build site data
+        site_data = {
+            'title': config.get('title', 'Sunsite'),
+            'description': config.get('description', ''),
+            'navigation': [],
+        }
+
+        # Parse markdown files and index their metadata
+        pages = self._parse_pages(content)
+        site_data['index'] = content_index
+
+        # Collect navigation items
+        for rel_path, url_path, page_data in pages:
+            # Skip if hidden in nav
+            if page_data['metadata'].get('hide_in_nav', False):
+                continue
+
+            # Add to navigation
+            site_data['navigation'].append({
+                'title': page_data['metadata'].get('nav_title', page_data['metadata'].get('title', rel_path.stem.title())),
+                'url': url_path,
+                'weight': page_data['metadata'].get('nav_weight', 999)
+            })
+
+        # Sort navigation by weight
+        site_data['navigation'].sort(key=lambda x: x['weight'])
+
+        # Generate responsive image variants and point pages at them
+        images_config = config.get('images')
+        if images_config:
+            from ..images.image_processor import ImageProcessor
+            if ImageProcessor.available():
+                image_processor = ImageProcessor(
+                    self.static_dir,
+                    self.content_dir,
+                    output_dir,
+                    cache_dir=self.project_dir / ".sunsite-cache" / "images",
+                    settings=images_config if isinstance(images_config, dict) else None,
+                )
+                outputs.update(image_processor.process((url_path, page_data['content']) for _, url_path, page_data in pages))
+                # Rewrite copies so cached parse results stay untouched
+                pages = [
+                    (rel_path, url_path, dict(page_data, content=image_processor.rewrite(page_data['content'], url_path)))
+                    for rel_path, url_path, page_data in pages
+                ]
+            else:
+                print("Pillow is not installed, skipping image processing. Install it with: pip install sunsite[images]")
+
+        # Generate HTML
+        for rel_path, url_path, page_data in pages:
+            output_path = page_output_path(rel_path, output_dir)
+            outputs.add(output_path.relative_to(output_dir))
+            if generator.generate_page(page_data, output_path, site_data):
+                print(f"Generated {output_path}")
+
+        # Generate tag listing pages
+        tags = content_index.tags()
+        for tag in tags:
+            output_path = output_dir / tag['url'].strip("/") / "index.html"
+            outputs.add(output_path.relative_to(output_dir))
+            if generator.generate_listing(
+                "tag.html", output_path, site_data,
+                title=f"#{tag['name']}", url=tag['url'],
+                tag=tag, pages=content_index.tagged(tag['slug']),
+            ):
+                print(f"Generated {output_path}")
+
+        if tags:
+            output_path = output_dir / "tags" / "index.html"
+            outputs.add(output_path.relative_to(output_dir))
+            if generator.generate_listing("tags.html", output_path, site_data, title="Tags", url="/tags/", tags=tags):
+                print(f"Generated {output_path}")
+
+        # Remove pages and static files the previous build wrote but this one didn't
+        for rel_path in self._outputs - outputs:
+            stale = output_dir / rel_path
+            if stale.exists():
+                stale.unlink()
+                generator.written.pop(os.path.abspath(stale), None)
+                print(f"Removed {stale}")
+                # Drop directories left empty, such as old image variant keys
+                parent = stale.parent
+                while parent != output_dir and not any(parent.iterdir()):
+                    parent.rmdir()
+                    parent = parent.parent
+        self._outputs = outputs
@@ -0,0 +1,372 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from html import escape, unescape
+from pathlib import Path
+
+from ..utils.urls import resolve_url
+
+# Source formats that get responsive variants (keyed by file extension)
+IMAGE_EXTENSIONS = {
+    '.jpg': 'jpeg',
+    '.jpeg': 'jpeg',
+    '.png': 'png',
+    '.webp': 'webp',
+}
+
+FORMAT_EXTENSIONS = {
+    'jpeg': 'jpg',
+    'png': 'png',
+    'webp': 'webp',
+    'avif': 'avif',
+}
+
+IMG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+ATTR_PATTERN = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+
+DEFAULT_SETTINGS = {
+    'widths': [480, 960, 1600],
+    'formats': ['webp'],
+    'quality': 80,
+    'sizes': '(max-width: 1200px) 100vw, 1200px',
+}
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def _save_options(fmt, quality):
+    if fmt == 'jpeg':
+        return {'quality': quality, 'optimize': True, 'progressive': True}
+    if fmt == 'png':
+        return {'optimize': True}
+    return {'quality': quality}
+
+
+def _generate_variants(source, dest_dir, widths, formats, quality):
+    """Write resized variants of one image into dest_dir.
+
+    Runs in a worker process. info.json is written last so a directory
+    without it is treated as incomplete and regenerated.
+    """
+    from PIL import Image, ImageOps
+
+    dest_dir = Path(dest_dir)
+    os.makedirs(dest_dir, exist_ok=True)
+
+    with Image.open(source) as image:
+        source_format = image.format.lower()
+        image = ImageOps.exif_transpose(image)
+        width, height = image.size
+
+        # The original file already covers its own width in its own format
+        variants = {fmt: [] for fmt in [source_format] + [f for f in formats if f != source_format]}
+        for target_width in sorted({w for w in widths if w < width} | {width}):
+            if target_width == width:
+                resized = image
+            else:
+                target_height = max(1, round(height * target_width / width))
+                resized = image.resize((target_width, target_height), Image.LANCZOS)
+
+            for fmt in variants:
+                if fmt == source_format and target_width == width:
+                    continue
+                converted = resized
+                if fmt == 'jpeg' and converted.mode not in ('RGB', 'L'):
+                    converted = converted.convert('RGB')
+                elif converted.mode not in ('RGB', 'RGBA', 'L'):
+                    converted = converted.convert('RGBA')
+                converted.save(
+                    dest_dir / f"{target_width}.{FORMAT_EXTENSIONS[fmt]}",
+                    format=fmt.upper(),
+                    **_save_options(fmt, quality),
+                )
+                variants[fmt].append(target_width)
+
+    info = {
+        'width': width,
+        'height': height,
+        'format': source_format,
+        'variants': variants,
+    }
+    with open(dest_dir / "info.json", "w") as f:
+        json.dump(info, f)
+
+    return info
+
+
+class ImageProcessor:
+    def __init__(self, static_dir, content_dir, output_dir, cache_dir, settings=None, jobs=None):
+        self.static_dir = Path(static_dir)
+        self.content_dir = Path(content_dir)
+        self.output_dir = Path(output_dir)
+        self.cache_dir = Path(cache_dir)
+        self.jobs = jobs or os.cpu_count() or 1
+
+        self.settings = DEFAULT_SETTINGS.copy()
+        self.settings.update(settings or {})
+        self.formats = self._supported_formats(self.settings['formats'])
+
+        # URL path -> image info for every processed image
+        self.images = {}
+
+        self._manifest_path = self.cache_dir / "manifest.json"
+        self._manifest = self._load_manifest()
+
+    @staticmethod
+    def available():
+        """Check whether Pillow is installed"""
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def _supported_formats(formats):
+        from PIL import features
+
+        supported = []
+        for fmt in formats:
+            fmt = fmt.lower()
+            if fmt not in FORMAT_EXTENSIONS or (fmt in ('webp', 'avif') and not features.check(fmt)):
+                print(f"Image format {fmt} is not supported, skipping")
+                continue
+            supported.append(fmt)
+        return supported
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._manifest_path, "w") as f:
+            json.dump(self._manifest, f)
+
+    def _find_source(self, url_path):
+        """Find the file an image URL refers to in static or content"""
+        rel_path = url_path.lstrip("/")
+        for base_dir in (self.static_dir, self.content_dir):
+            source = base_dir / rel_path
+            if source.is_file():
+                return source
+        return None
+
+    def _cache_key(self, source):
+        """Key derivatives by source content and the settings that shape them.
+
+        The source hash is reused while the file's size and mtime are
+        unchanged, so warm builds never re-read large originals.
+        """
+        stat = source.stat()
+        entry = self._manifest.get(str(source))
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            source_hash = entry['hash']
+        else:
+            digest = hashlib.sha256()
+            with open(source, "rb") as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                    digest.update(block)
+            source_hash = digest.hexdigest()
+            self._manifest[str(source)] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'hash': source_hash,
+            }
+
+        settings = json.dumps([self.settings['widths'], self.formats, self.settings['quality']])
+        return hashlib.sha256(f"{source_hash}:{settings}".encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _parse_attrs(tag):
+        attrs = {}
+        for attr in ATTR_PATTERN.finditer(tag[len("<img"):]):
+            value = attr.group(2) or attr.group(3) or attr.group(4) or ""
+            attrs[attr.group(1).lower()] = unescape(value)
+        return attrs
+
+    def _image_urls(self, html, base_url):
+        for match in IMG_PATTERN.finditer(html):
+            src = self._parse_attrs(match.group(0)).get('src')
+            if not src:
+                continue
+            target = resolve_url(base_url, src)
+            if target is not None and Path(target[0]).suffix.lower() in IMAGE_EXTENSIONS:
+                yield target[0]
+
+    def process(self, pages):
+        """Generate variants for every image referenced by the given pages.
+
+        pages is an iterable of (url, html) pairs. Only images missing
+        from the cache are generated, on a process pool. Returns the paths,
+        relative to the output directory, of every file put in the output.
+        """
+        pending = {}
+        for base_url, html in pages:
+            for url_path in self._image_urls(html, base_url):
+                if url_path in self.images or url_path in pending:
+                    continue
+                source = self._find_source(url_path)
+                if source is None:
+                    continue
+
+                key = self._cache_key(source)
+                info = self._load_cached(key)
+                if info is not None:
+                    self.images[url_path] = dict(info, key=key, source=str(source))
+                else:
+                    pending[url_path] = (source, key)
+
+        self._generate(pending)
+        self._save_manifest()
+
+        published = set()
+        for url_path, info in list(self.images.items()):
+            try:
+                published.update(self._publish(url_path, info))
+            except OSError as e:
+                print(f"Error publishing image {info['source']}: {e}")
+                # Pages keep their plain <img> for it
+                del self.images[url_path]
+        return published
+
+    def _load_cached(self, key):
+        """Load the info of cached variants, or None if any of them is missing"""
+        cache_dir = self.cache_dir / key
+        try:
+            with open(cache_dir / "info.json", "r") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        for fmt, widths in info['variants'].items():
+            for width in widths:
+                if not (cache_dir / f"{width}.{FORMAT_EXTENSIONS[fmt]}").exists():
+                    return None
+        return info
+
+    def _generate(self, pending):
+        if not pending:
+            return
+
+        args = {
+            url_path: (str(source), str(self.cache_dir / key), self.settings['widths'], self.formats, self.settings['quality'])
+            for url_path, (source, key) in pending.items()
+        }
+
+        def record(url_path, info):
+            source, key = pending[url_path]
+            self.images[url_path] = dict(info, key=key, source=str(source))
+            print(f"Processed image {source}")
+
+        # Spawning workers costs more than resizing a single image inline
+        if self.jobs == 1 or len(pending) == 1:
+            for url_path, job in args.items():
+                try:
+                    record(url_path, _generate_variants(*job))
+                except Exception as e:
+                    print(f"Error processing image {job[0]}: {e}")
+            return
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            futures = {url_path: executor.submit(_generate_variants, *job) for url_path, job in args.items()}
+            for url_path, future in futures.items():
+                try:
+                    record(url_path, future.result())
+                except Exception as e:
+                    print(f"Error processing image {args[url_path][0]}: {e}")
+
+    def _variant_url(self, url_path, info, width, fmt):
+        stem = Path(url_path).stem
+        return f"/_images/{info['key']}/{stem}-{width}.{FORMAT_EXTENSIONS[fmt]}"
+
+    def _publish(self, url_path, info):
+        """Copy cached variants (and originals kept in content) into the output.
+
+        Returns the paths of the files, relative to the output directory.
+        """
+        published = []
+        cache_dir = self.cache_dir / info['key']
+        for fmt, widths in info['variants'].items():
+            for width in widths:
+                rel_path = Path(self._variant_url(url_path, info, width, fmt).lstrip("/"))
+                published.append(rel_path)
+                target = self.output_dir / rel_path
+                if target.exists():
+                    continue
+                os.makedirs(target.parent, exist_ok=True)
+                source = cache_dir / f"{width}.{FORMAT_EXTENSIONS[fmt]}"
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy2(source, target)
+
+        # Originals from static are copied with the rest of static
+        source = Path(info['source'])
+        if source == self.static_dir / url_path.lstrip("/"):
+            return published
+
+        rel_path = Path(url_path.lstrip("/"))
+        published.append(rel_path)
+        original = self.output_dir / rel_path
+        source_stat = source.stat()
+        if original.exists():
+            original_stat = original.stat()
+            if (original_stat.st_size, original_stat.st_mtime_ns) == (source_stat.st_size, source_stat.st_mtime_ns):
+                return published
+        os.makedirs(original.parent, exist_ok=True)
+        shutil.copy2(source, original)
+        return published
+
+    def _srcset(self, url_path, info, fmt):
+        candidates = [f"{self._variant_url(url_path, info, width, fmt)} {width}w" for width in info['variants'][fmt]]
+        if fmt == info['format']:
+            candidates.append(f"{url_path} {info['width']}w")
+        return ", ".join(candidates)
+
+    def rewrite(self, html, base_url):
+        """Rewrite <img> tags for processed images into responsive <picture> elements"""
+        if not self.images:
+            return html
+
+        def replace(match):
+            tag = match.group(0)
+            attrs = self._parse_attrs(tag)
+            if 'srcset' in attrs or not attrs.get('src'):
+                return tag
+            target = resolve_url(base_url, attrs['src'])
+            info = self.images.get(target[0]) if target else None
+            if info is None:
+                return tag
+
+            url_path = target[0]
+            sizes = escape(self.settings['sizes'])
+            extra = [
+                f'srcset="{escape(self._srcset(url_path, info, info["format"]))}"',
+                f'sizes="{sizes}"',
+            ]
+            if 'width' not in attrs and 'height' not in attrs:
+                extra.append(f'width="{info["width"]}" height="{info["height"]}"')
+            if 'loading' not in attrs:
+                extra.append('loading="lazy"')
+            if 'decoding' not in attrs:
+                extra.append('decoding="async"')
+
+            img = tag[:-1].rstrip().rstrip("/").rstrip() + " " + " ".join(extra) + " />"
+
+            sources = [
+                f'<source type="image/{fmt}" srcset="{escape(self._srcset(url_path, info, fmt))}" sizes="{sizes}">'
+                for fmt in info['variants']
+                if fmt != info['format'] and info['variants'][fmt]
+            ]
+            if not sources:
+                return img
+            return "<picture>" + "".join(sources) + img + "</picture>"
+
+        return IMG_PATTERN.sub(replace, html)
@@ -1,8 +1,21 @@
 import frontmatter
 import markdown
 import re
+from html import unescape
 from pathlib import Path
 
+def _heading_tree(tokens):
+    """Convert toc extension tokens into a tree of headings"""
+    return [
+        {
+            'level': token['level'],
+            'id': token['id'],
+            'text': unescape(token['name']),
+            'children': _heading_tree(token['children']),
+        }
+        for token in tokens
+    ]
+
 class MarkdownParser:
     def __init__(self, extensions=None):
         self.extensions = extensions or [
@@ -38,8 +51,11 @@ class MarkdownParser:
         
         html_content = self.md.convert(content_without_title)
         
+        # Headings come from the same conversion pass as the HTML, so nothing
+        # downstream needs to parse the HTML to find them
         return {
             'metadata': metadata,
             'content': html_content,
             'toc': getattr(self.md, 'toc', ''),
-        }
\ No newline at end of file
+            'headings': _heading_tree(getattr(self.md, 'toc_tokens', [])),
+        }
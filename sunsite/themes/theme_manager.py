@@ -4,7 +4,7 @@ import json
 from pathlib import Path
 
 class ThemeManager:
-    def __init__(self, config_path=None):
+    def __init__(self, config_path=None, config=None):
         self.config_path = config_path
         self.default_theme = {
             'accent_color': '#3498db',
@@ -14,7 +14,9 @@ class ThemeManager:
         }
         self.theme = self.default_theme.copy()
         
-        if config_path:
+        if config is not None:
+            self.load_config_data(config)
+        elif config_path:
             self.load_config(config_path)
     
     def load_config(self, config_path):
@@ -23,11 +25,15 @@ class ThemeManager:
             with open(config_path, 'r') as f:
                 config = yaml.safe_load(f)
             
-            if 'theme' in config:
-                self.theme.update(config['theme'])
+            self.load_config_data(config)
         except Exception as e:
             print(f"Error loading theme config: {e}")
     
+    def load_config_data(self, config):
+        """Load theme configuration from an already parsed config"""
+        if config and 'theme' in config:
+            self.theme.update(config['theme'])
+    
 
     def get_css_variables(self):
         """Generate CSS variables from theme settings"""
@@ -0,0 +1,194 @@
+import contextlib
+import hashlib
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import time
+from pathlib import Path
+
+# Seconds to wait for the daemon to accept a connection, and for the reply
+# to a ping. Builds are waited on for as long as they take.
+CONNECT_TIMEOUT = 1
+
+
+def _is_private(path):
+    """Check that a path is a real directory only the current user can use"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def _socket_dir():
+    """Get a directory other users can't create sockets in.
+
+    Returns None if the fallback directory in the shared temp dir exists
+    but isn't private to the current user.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and _is_private(runtime_dir):
+        return Path(runtime_dir)
+
+    directory = Path(tempfile.gettempdir()) / f"sunsite-{os.getuid()}"
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    if not _is_private(directory):
+        print(f"Not using {directory} for the build daemon: it must be a directory only you can access")
+        return None
+    return directory
+
+
+def socket_path(project_dir="."):
+    """Get the Unix socket path of the build daemon for a project.
+
+    Returns None if there is no safe directory to put it in.
+    """
+    directory = _socket_dir()
+    if directory is None:
+        return None
+    project = str(Path(project_dir).resolve())
+    # Keyed by project path, since project paths can exceed the length
+    # limit for Unix socket addresses
+    key = hashlib.sha1(project.encode()).hexdigest()[:16]
+    return directory / f"sunsite-{key}.sock"
+
+
+def _send(path, request, timeout=None):
+    """Send a request to the daemon and return its response.
+
+    Returns None if no daemon owned by the current user accepts the
+    connection. Once the request is sent, a reply that times out or never
+    comes is returned as an error response rather than None, so callers
+    don't start a second build while the daemon may still be writing.
+    """
+    try:
+        if path is None or os.stat(path).st_uid != os.getuid():
+            return None
+    except OSError:
+        return None
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return None
+
+        try:
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as f:
+                response = f.readline()
+            if not response:
+                raise ValueError("connection closed without a reply")
+            return json.loads(response)
+        except (OSError, ValueError) as e:
+            return {'status': 'error', 'log': f"Lost the reply from the build daemon at {path}: {e}\n"}
+
+
+def request_build(project_dir=".", output_dir="_site", check_links=False):
+    """Ask the project's build daemon to build the site.
+
+    Returns the daemon's response, or None if no daemon is available.
+    """
+    return _send(socket_path(project_dir), {
+        'command': 'build',
+        'output': os.path.abspath(output_dir),
+        'check': check_links,
+    })
+
+
+def stop_daemon(project_dir="."):
+    """Ask the project's build daemon to exit"""
+    return _send(socket_path(project_dir), {'command': 'stop'}) is not None
+
+
+def run_daemon(project_dir=".", output_dir="_site"):
+    """Keep a SiteBuilder warm and serve build requests over a Unix socket"""
+    from ..generator.site_builder import SiteBuilder
+
+    path = socket_path(project_dir)
+    if path is None:
+        return False
+    if os.path.lexists(path):
+        # A daemon busy with a build may not answer the ping in time, but
+        # it still accepts the connection
+        if _send(path, {'command': 'ping'}, timeout=CONNECT_TIMEOUT) is not None:
+            print(f"A daemon is already running for this project at {path}")
+            return False
+        path.unlink()
+
+    builder = SiteBuilder(project_dir)
+
+    def build(output, check_links):
+        log = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            try:
+                result = builder.build(output, check_links=check_links)
+            except Exception as e:
+                print(f"Error: {e}")
+                result = None
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Built {output} in {elapsed:.0f} ms")
+        broken = len(builder.link_check['broken']) if builder.link_check else 0
+        return {
+            'status': 'ok' if result and not broken else 'error',
+            'output': str(result) if result else None,
+            'broken': broken,
+            'log': log.getvalue(),
+        }
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+            except ValueError:
+                request = {}
+
+            command = request.get('command')
+            if command == 'build':
+                response = build(request.get('output', output_dir), request.get('check', False))
+            elif command in ('ping', 'stop'):
+                response = {'status': 'ok'}
+                self.server.stopping = command == 'stop'
+            else:
+                response = {'status': 'error', 'log': f"Unknown command: {command}\n"}
+
+            try:
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+            except (BrokenPipeError, ConnectionResetError):
+                print("Client disconnected before the reply was sent")
+
+    # Warm the builder before accepting requests
+    print(build(output_dir, False)['log'], end="")
+
+    # Only the current user may connect
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(str(path), Handler)
+    finally:
+        os.umask(umask)
+
+    # Requests are handled one at a time, so builds never overlap
+    with server:
+        server.stopping = False
+        print(f"Build daemon listening at {path}")
+        try:
+            while not server.stopping:
+                server.handle_request()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink(missing_ok=True)
+
+    print("Daemon stopped.")
+    return True
@@ -0,0 +1,66 @@
+import posixpath
+from pathlib import Path, PurePosixPath
+from urllib.parse import unquote
+
+def page_url(rel_path):
+    """Get the site URL for a content file path relative to the content directory"""
+    rel_path = PurePosixPath(Path(rel_path).as_posix())
+
+    # Use the directory URL for index.md
+    if rel_path.name == "index.md":
+        if rel_path.parent == PurePosixPath("."):
+            return "/"
+        return "/" + str(rel_path.parent) + "/"
+
+    return "/" + str(rel_path.with_suffix(".html"))
+
+
+def output_path(rel_path, output_dir):
+    """Get the output file path for a content file path relative to the content directory"""
+    rel_path = Path(rel_path)
+    output_dir = Path(output_dir)
+
+    if rel_path.name == "index.md":
+        return output_dir / rel_path.parent / "index.html"
+
+    return output_dir / rel_path.with_suffix(".html")
+
+
+def file_url(rel_path):
+    """Get the URL a file in the output directory is served at"""
+    rel_path = PurePosixPath(Path(rel_path).as_posix())
+
+    if rel_path.name == "index.html":
+        if rel_path.parent == PurePosixPath("."):
+            return "/"
+        return "/" + str(rel_path.parent) + "/"
+
+    return "/" + str(rel_path)
+
+
+def resolve_url(base_url, link):
+    """Resolve a link against the URL of the page or file it appears in.
+
+    Returns a (path, fragment) tuple, or None for external links.
+    """
+    path, _, fragment = link.strip().partition('#')
+    path = path.partition('?')[0]
+
+    # Protocol-relative URLs and anything with a scheme (http:, mailto:, data:)
+    if path.startswith('//') or ':' in path.split('/', 1)[0]:
+        return None
+
+    if not path:
+        return base_url, fragment
+
+    if not path.startswith('/'):
+        path = posixpath.dirname(base_url) + '/' + path
+
+    is_dir = path.endswith('/') or path.rsplit('/', 1)[-1] in ('.', '..')
+    path = posixpath.normpath(path)
+    if path.startswith('//'):
+        path = path[1:]
+    if is_dir and path != '/':
+        path += '/'
+
+    return unquote(path), fragment